@@ -1,23 +1,30 @@
 import os
 import re
 import time
-import tempfile
 import threading
-import subprocess
 import sqlite3
+import queue
 import json
 import base64
 import hashlib
 import hmac
 import html
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from io import BytesIO
 from zoneinfo import ZoneInfo
 from uuid import uuid4
-from functools import wraps
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from urllib.parse import urlencode, urljoin, urlparse
 
+import numpy as np
+import orjson
 import requests
 import websocket
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import (
     Flask,
     g,
@@ -28,10 +35,13 @@ from flask import (
     make_response,
     redirect,
     url_for,
+    Response,
+    stream_with_context,
 )
+from flask.json.provider import DefaultJSONProvider
 from flask_sock import Sock
 
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
 from performance_monitor import monitor
 
 if os.getenv("RENDER") is None:
@@ -42,19 +52,71 @@ DEEPSEEK_API_KEY = (os.getenv("DEEPSEEK_API_KEY") or "").strip()
 DEEPSEEK_MODEL = (os.getenv("DEEPSEEK_MODEL") or "deepseek-chat").strip()
 DEEPSEEK_URL = (os.getenv("DEEPSEEK_URL") or "https://api.deepseek.com/v1/chat/completions").strip()
 
-WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")
+# English-only checkpoints (tiny.en, base.en, distil-small.en, distil-medium.en) skip multilingual overhead.
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny.en")
+WHISPER_LANGUAGE = (os.getenv("WHISPER_LANGUAGE") or "en").strip()
+WHISPER_DEVICE = (os.getenv("WHISPER_DEVICE") or "auto").strip()
+WHISPER_COMPUTE_TYPE = (os.getenv("WHISPER_COMPUTE_TYPE") or "auto").strip()
+AVAILABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 4)
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS") or "2")
+# cpu_threads is per CTranslate2 worker, so split the usable cores between them instead of oversubscribing.
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS") or str(max(1, AVAILABLE_CPUS // WHISPER_NUM_WORKERS)))
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE") or "1")
+WHISPER_MAX_BEAM_SIZE = int(os.getenv("WHISPER_MAX_BEAM_SIZE") or "5")
+WHISPER_BEST_OF = int(os.getenv("WHISPER_BEST_OF") or "1")
+WHISPER_TEMPERATURE = float(os.getenv("WHISPER_TEMPERATURE") or "0")
+WHISPER_VAD_FILTER = (os.getenv("WHISPER_VAD_FILTER") or "true").strip().lower() not in {"0", "false", "no", "off"}
+WHISPER_VAD_MIN_SILENCE_MS = int(os.getenv("WHISPER_VAD_MIN_SILENCE_MS") or "500")
+WHISPER_SAMPLE_RATE = 16000
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY") or str(WHISPER_NUM_WORKERS))
+TRANSCRIBE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TRANSCRIBE_QUEUE_TIMEOUT_SECONDS") or "1")
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE") or "64")
 AUTH_CODE = (os.getenv("AUTH_CODE") or "").strip()
 DB_PATH = os.getenv("DB_PATH") or "vividmedi.db"
 EXTENSION_SYNC_TOKEN = (os.getenv("EXTENSION_SYNC_TOKEN") or "").strip()
 MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_MB") or "25") * 1024 * 1024
-FFMPEG_TIMEOUT_SECONDS = int(os.getenv("FFMPEG_TIMEOUT_SECONDS") or "60")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv("FLASK_SECRET_KEY") or os.getenv("SECRET_KEY") or "dev-insecure-change-me"
 app.config["MAX_CONTENT_LENGTH"] = MAX_AUDIO_UPLOAD_BYTES
 sock = Sock(app)
 
-http = requests.Session()
+def build_http_session() -> requests.Session:
+    # Connection errors are retried for every method; status retries only apply to
+    # idempotent requests, so Twilio call creation is never replayed after a 5xx.
+    adapter = HTTPAdapter(
+        pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS") or "32"),
+        pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE") or "64"),
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http = build_http_session()
 transcript_clients = set()
 transcript_clients_lock = threading.Lock()
 active_transcript_streams = 0
@@ -135,17 +197,40 @@ def twilio_stream_secret_misconfigured_response():
     return None
 
 
-def db_conn():
+_db_pool = queue.Queue(maxsize=int(os.getenv("SQLITE_POOL_SIZE") or "8"))
+
+
+def open_db_connection():
     timeout = float(os.getenv("SQLITE_TIMEOUT_SECONDS") or "30")
-    conn = sqlite3.connect(DB_PATH, timeout=timeout, check_same_thread=False)
+    conn = sqlite3.connect(DB_PATH, timeout=timeout, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
     conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_BYTES') or '268435456')}")
     return conn
 
 
+@contextmanager
+def db_conn():
+    # Connections run in autocommit mode and are returned to the pool after use,
+    # so each request reuses an open handle instead of reopening the db/wal/shm files.
+    try:
+        conn = _db_pool.get_nowait()
+    except queue.Empty:
+        conn = open_db_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            _db_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
 def init_history_db():
     with db_conn() as conn:
-        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS history_entries (
@@ -168,7 +253,8 @@ def init_history_db():
             )
             """
         )
-        conn.commit()
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_history_user_id ON history_entries(user_key, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_medirecords_sync_user_id ON medirecords_sync_entries(user_key, id)")
 
 
 def delete_history_entry(entry_id: int) -> bool:
@@ -177,15 +263,27 @@ def delete_history_entry(entry_id: int) -> bool:
             "DELETE FROM history_entries WHERE id = ? AND user_key = ?",
             (entry_id, session_user_key()),
         )
-        conn.commit()
         return cur.rowcount > 0
 
 
 def clear_history_entries() -> int:
     with db_conn() as conn:
         cur = conn.execute("DELETE FROM history_entries WHERE user_key = ?", (session_user_key(),))
-        conn.commit()
         return cur.rowcount
+
+
+_utc_iso_cache = [0, ""]
+
+
+def utc_now_iso() -> str:
+    now = int(time.time())
+    cached_at, formatted = _utc_iso_cache
+    if now != cached_at:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now))
+        _utc_iso_cache[:] = [now, formatted]
+    return formatted
+
+
 def session_user_key() -> str:
     return "code_user" if session.get("authenticated") is True else "guest"
 
@@ -194,9 +292,8 @@ def save_history(item_type: str, content: str):
     with db_conn() as conn:
         conn.execute(
             "INSERT INTO history_entries (user_key, item_type, content, created_at) VALUES (?, ?, ?, ?)",
-            (session_user_key(), item_type, content, datetime.utcnow().isoformat()),
+            (session_user_key(), item_type, content, utc_now_iso()),
         )
-        conn.commit()
 
 
 def load_history(limit: int = 200):
@@ -227,9 +324,8 @@ def save_medirecords_sync(payload: dict, source: str = "extension"):
             INSERT INTO medirecords_sync_entries (user_key, payload, source, created_at)
             VALUES (?, ?, ?, ?)
             """,
-            ("extension", json.dumps(payload), source, datetime.utcnow().isoformat()),
+            ("extension", orjson.dumps(payload).decode("utf-8"), source, utc_now_iso()),
         )
-        conn.commit()
 
 
 def latest_medirecords_sync():
@@ -248,7 +344,7 @@ def latest_medirecords_sync():
         return None
     return {
         "id": row["id"],
-        "payload": json.loads(row["payload"]),
+        "payload": orjson.loads(row["payload"]),
         "source": row["source"],
         "created_at": row["created_at"],
     }
@@ -606,7 +702,7 @@ def twilio_stream(ws):
             if raw is None:
                 break
             try:
-                message = json.loads(raw)
+                message = orjson.loads(raw)
             except (TypeError, ValueError):
                 continue
             event = message.get("event")
@@ -659,7 +755,7 @@ def twilio_stream(ws):
 
 def send_transcript_message(ws, payload) -> bool:
     try:
-        ws.send(json.dumps(payload))
+        ws.send(payload if isinstance(payload, str) else orjson.dumps(payload).decode("utf-8"))
         return True
     except Exception:
         return False
@@ -669,8 +765,9 @@ def broadcast_transcript(payload):
     with transcript_clients_lock:
         clients = list(transcript_clients)
     stale = []
+    message = orjson.dumps(payload).decode("utf-8")
     for client in clients:
-        if not send_transcript_message(client, payload):
+        if not send_transcript_message(client, message):
             stale.append(client)
     if stale:
         with transcript_clients_lock:
@@ -770,7 +867,7 @@ def transcribe_audio_with_deepgram(audio_bytes: bytes, content_type: str) -> str
 
 def handle_deepgram_message(raw, role_label: str):
     try:
-        data = json.loads(raw)
+        data = orjson.loads(raw)
     except (TypeError, ValueError):
         return
     transcript = (
@@ -787,10 +884,14 @@ def handle_deepgram_message(raw, role_label: str):
     broadcast_transcript({"type": "transcript", "text": f"{role_label}: {transcript}", "speaker": role_label})
 
 
+HTTP_SCHEME_RE = re.compile(r"^https?://", re.IGNORECASE)
+HTTP_TO_WS_SCHEME_RE = re.compile(r"^http(s?):", re.IGNORECASE)
+
+
 def twilio_base_url() -> str:
     configured = (os.getenv("BASE_URL") or os.getenv("APP_BASE_URL") or "").strip()
     base_url = configured or request.host_url
-    if base_url and not re.match(r"^https?://", base_url, flags=re.IGNORECASE):
+    if base_url and not HTTP_SCHEME_RE.match(base_url):
         base_url = f"https://{base_url}"
     return base_url if base_url.endswith("/") else f"{base_url}/"
 
@@ -802,8 +903,7 @@ def twilio_media_stream_url(room: str, role: str) -> str:
     else:
         base_url = twilio_base_url()
         stream_url = urljoin(base_url, "twilio-stream")
-        stream_url = re.sub(r"^https:", "wss:", stream_url, flags=re.IGNORECASE)
-        stream_url = re.sub(r"^http:", "ws:", stream_url, flags=re.IGNORECASE)
+        stream_url = HTTP_TO_WS_SCHEME_RE.sub(lambda m: "wss:" if m.group(1) else "ws:", stream_url)
     return stream_url
 
 
@@ -827,9 +927,12 @@ def twilio_stream_track(role: str) -> str:
     return "both_tracks"
 
 
+STREAM_NAME_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9_-]+")
+
+
 def twilio_stream_name(room: str, role: str) -> str:
-    safe_room = re.sub(r"[^a-zA-Z0-9_-]+", "-", room or "consult").strip("-")[:64]
-    safe_role = re.sub(r"[^a-zA-Z0-9_-]+", "-", role or "call").strip("-")[:24]
+    safe_room = STREAM_NAME_UNSAFE_RE.sub("-", room or "consult").strip("-")[:64]
+    safe_role = STREAM_NAME_UNSAFE_RE.sub("-", role or "call").strip("-")[:24]
     return f"{safe_room}-{safe_role}"
 
 
@@ -888,9 +991,14 @@ def twilio_response_error(response) -> str:
     return response.text or f"HTTP {response.status_code}"
 
 
+PHONE_NOISE_RE = re.compile(r"[^\d+]")
+E164_PHONE_RE = re.compile(r"\+\d{8,15}")
+NON_DIGIT_RE = re.compile(r"\D")
+
+
 def normalize_e164_phone(phone: str) -> str:
-    cleaned = re.sub(r"[^\d+]", "", phone or "")
-    if cleaned.startswith("+") and re.fullmatch(r"\+\d{8,15}", cleaned):
+    cleaned = PHONE_NOISE_RE.sub("", phone or "")
+    if cleaned.startswith("+") and E164_PHONE_RE.fullmatch(cleaned):
         return cleaned
     return ""
 
@@ -900,10 +1008,10 @@ def normalize_twilio_from_phone(phone: str) -> str:
 
 
 def normalize_au_phone(phone: str) -> str:
-    cleaned = re.sub(r"[^\d+]", "", phone or "")
-    if cleaned.startswith("+") and re.fullmatch(r"\+\d{8,15}", cleaned):
+    cleaned = PHONE_NOISE_RE.sub("", phone or "")
+    if cleaned.startswith("+") and E164_PHONE_RE.fullmatch(cleaned):
         return cleaned
-    digits = re.sub(r"\D", "", cleaned)
+    digits = NON_DIGIT_RE.sub("", cleaned)
     if digits.startswith("61") and len(digits) == 11:
         return f"+{digits}"
     if digits.startswith("0") and len(digits) == 10:
@@ -912,16 +1020,122 @@ def normalize_au_phone(phone: str) -> str:
 
 _whisper_model = None
 _whisper_init_lock = threading.Lock()
-_transcribe_lock = threading.Lock()
+_transcribe_slots = threading.BoundedSemaphore(TRANSCRIBE_CONCURRENCY)
 
 def get_whisper_model():
     global _whisper_model
     if _whisper_model is None:
         with _whisper_init_lock:
             if _whisper_model is None:
-                _whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
+                _whisper_model = WhisperModel(
+                    WHISPER_MODEL_SIZE,
+                    device=WHISPER_DEVICE,
+                    device_index=0,
+                    compute_type=WHISPER_COMPUTE_TYPE,
+                    cpu_threads=WHISPER_CPU_THREADS,
+                    num_workers=WHISPER_NUM_WORKERS,
+                )
     return _whisper_model
 
+
+_transcript_cache = OrderedDict()
+_transcript_cache_lock = threading.Lock()
+
+
+def audio_cache_key(audio_bytes: bytes) -> str:
+    return hashlib.blake2b(audio_bytes, digest_size=16).hexdigest()
+
+
+def cached_transcript(key: str) -> str | None:
+    with _transcript_cache_lock:
+        text = _transcript_cache.get(key)
+        if text is not None:
+            _transcript_cache.move_to_end(key)
+        return text
+
+
+def remember_transcript(key: str, text: str):
+    if TRANSCRIPT_CACHE_SIZE <= 0 or not text:
+        return
+    with _transcript_cache_lock:
+        _transcript_cache[key] = text
+        _transcript_cache.move_to_end(key)
+        while len(_transcript_cache) > TRANSCRIPT_CACHE_SIZE:
+            _transcript_cache.popitem(last=False)
+
+
+def requested_beam_size(raw) -> int:
+    try:
+        beam_size = int(raw)
+    except (TypeError, ValueError):
+        return WHISPER_BEAM_SIZE
+    return min(max(beam_size, 1), WHISPER_MAX_BEAM_SIZE)
+
+
+def whisper_transcribe_options(beam_size: int | None = None) -> dict:
+    beam_size = beam_size or WHISPER_BEAM_SIZE
+    options = {
+        "language": WHISPER_LANGUAGE or None,
+        "task": "transcribe",
+        "beam_size": beam_size,
+        "best_of": WHISPER_BEST_OF,
+        "temperature": WHISPER_TEMPERATURE,
+        "vad_filter": WHISPER_VAD_FILTER,
+    }
+    if WHISPER_VAD_FILTER:
+        options["vad_parameters"] = {"min_silence_duration_ms": WHISPER_VAD_MIN_SILENCE_MS}
+    if beam_size == 1:
+        options.update(without_timestamps=True, condition_on_previous_text=False)
+    return options
+
+
+def whisper_needed() -> bool:
+    if not (os.getenv("DEEPGRAM_API_KEY") or "").strip():
+        return True
+    return env_flag("MIC_TRANSCRIBE_FALLBACK_TO_WHISPER", False)
+
+
+def warm_whisper_model():
+    try:
+        model = get_whisper_model()
+        # VAD would strip pure silence before decoding, so disable it for the warm-up pass.
+        options = dict(whisper_transcribe_options(), vad_filter=False)
+        segments, _info = model.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), **options)
+        list(segments)
+    except Exception as exc:
+        app.logger.warning("Whisper warm-up failed: %s", exc)
+
+
+def whisper_event_stream(audio, options: dict):
+    # The caller already holds a transcription slot; it is released when the response closes.
+    def events():
+        try:
+            segments, _info = get_whisper_model().transcribe(audio, **options)
+            for seg in segments:
+                text = (seg.text or "").strip()
+                if text:
+                    yield f"data: {orjson.dumps({'delta': text}).decode('utf-8')}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            print("TRANSCRIBE ERROR:", repr(e))
+            yield f"data: {orjson.dumps({'error': 'Transcription failed'}).decode('utf-8')}\n\n"
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(_transcribe_slots.release)
+    return response
+
+
+def start_whisper_warmup():
+    if not env_flag("WHISPER_PRELOAD", True) or not whisper_needed():
+        return None
+    thread = threading.Thread(target=warm_whisper_model, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
 CLINICAL_SYSTEM_PROMPT = (
     "You are an Australian clinical education assistant for qualified medical doctors.\n\n"
     "OUTPUT FORMAT (MANDATORY):\n"
@@ -958,6 +1172,23 @@ DVA_SYSTEM_PROMPT = (
     "Summary\nAssessment\nDiagnosis\nInvestigations\nTreatment\nMonitoring\nFollow-up & Safety Netting\nRed Flags\nReferences\n"
 )
 
+DVA_USER_TEMPLATE = "Referral intent: {intent}\n\nDETAILS:\n{{query}}\n\nFollow DVA_META format then clinical headings."
+
+GENERATE_USER_TEMPLATES = {
+    "dva_new": DVA_USER_TEMPLATE.format(intent="D0904 new"),
+    "dva_renew": DVA_USER_TEMPLATE.format(intent="D0904 renewal"),
+    "dva": DVA_USER_TEMPLATE.format(intent="D0904 (unspecified)"),
+    "clinical": "Clinical question:\n{query}\n\nIf pasted data is included, sort it into the correct headings.",
+}
+
+
+def build_generate_prompt(mode: str, query: str) -> tuple[str, str]:
+    if mode.startswith("dva"):
+        template = GENERATE_USER_TEMPLATES.get(mode, GENERATE_USER_TEMPLATES["dva"])
+        return DVA_SYSTEM_PROMPT, template.format(query=query)
+    return CLINICAL_SYSTEM_PROMPT, GENERATE_USER_TEMPLATES["clinical"].format(query=query)
+
+
 CONSULT_NOTE_SYSTEM_PROMPT = (
     "You are an Australian clinician assistant.\n\n"
     "Task: Convert the provided raw dictation/pasted data into a high-quality clinical note.\n"
@@ -1328,11 +1559,45 @@ MENOVA_ED_PE_NOTE_STRUCTURE = (
 )
 
 
+PERTH_TZ = ZoneInfo("Australia/Perth")
+_perth_date_cache = [0, ""]
+
+
+def perth_today() -> str:
+    now = int(time.time())
+    cached_at, formatted = _perth_date_cache
+    if now != cached_at:
+        formatted = datetime.fromtimestamp(now, PERTH_TZ).strftime("%d/%m/%Y")
+        _perth_date_cache[:] = [now, formatted]
+    return formatted
+
+
 def build_consult_prompt_context(consult_type: str) -> str:
     normalized = (consult_type or "").strip().lower()
     chosen_type = normalized or "general consultation note"
     guidance = CONSULT_TYPE_INSTRUCTIONS.get(chosen_type, CONSULT_TYPE_INSTRUCTIONS["general consultation note"])
-    today_date = datetime.now(ZoneInfo("Australia/Perth")).strftime("%d/%m/%Y")
+    if chosen_type == "vapac weight loss application":
+        return (
+            f"Consult type selected: {chosen_type}.\n"
+            f"Structure emphasis: {guidance}\n\n"
+            f"{VAPAC_WEIGHT_LOSS_APPLICATION_STRUCTURE.format(today_date=perth_today())}\n\n"
+            "Organisation workflow priority:\n"
+            "The final output is a formal application letter to VAPAC, not a routine consult note. "
+            "Use the supplied pasted information to populate the letter. Keep it professional, concise and defensible. "
+            "For the 5% continuation rule, compare the current weight against the baseline weight for the most recent "
+            "approved funding interval, generally the last 4 months / 4 pens, not the original treatment starting "
+            "weight from older approvals. If a medication issue list is pasted, infer the current interval start by "
+            "sorting RPBS tirzepatide/semaglutide issue dates oldest-to-newest and grouping them into 4-pen blocks; "
+            "the first script in the latest 4-pen block anchors the interval baseline date. At the bottom, always "
+            "include a Critical information missing / issues to address section."
+        )
+
+    return static_consult_prompt_context(chosen_type, guidance)
+
+
+# Every consult type except the dated VAPAC letter renders to a fixed string, so build each one once.
+@lru_cache(maxsize=64)
+def static_consult_prompt_context(chosen_type: str, guidance: str) -> str:
     if chosen_type == "weight loss initial consult":
         return (
             f"Consult type selected: {chosen_type}.\n"
@@ -1356,22 +1621,6 @@ def build_consult_prompt_context(consult_type: str) -> str:
             "without bloating the note."
         )
 
-    if chosen_type == "vapac weight loss application":
-        return (
-            f"Consult type selected: {chosen_type}.\n"
-            f"Structure emphasis: {guidance}\n\n"
-            f"{VAPAC_WEIGHT_LOSS_APPLICATION_STRUCTURE.format(today_date=today_date)}\n\n"
-            "Organisation workflow priority:\n"
-            "The final output is a formal application letter to VAPAC, not a routine consult note. "
-            "Use the supplied pasted information to populate the letter. Keep it professional, concise and defensible. "
-            "For the 5% continuation rule, compare the current weight against the baseline weight for the most recent "
-            "approved funding interval, generally the last 4 months / 4 pens, not the original treatment starting "
-            "weight from older approvals. If a medication issue list is pasted, infer the current interval start by "
-            "sorting RPBS tirzepatide/semaglutide issue dates oldest-to-newest and grouping them into 4-pen blocks; "
-            "the first script in the latest 4-pen block anchors the interval baseline date. At the bottom, always "
-            "include a Critical information missing / issues to address section."
-        )
-
     if chosen_type == "ed mh review":
         return (
             f"Consult type selected: {chosen_type}.\n"
@@ -1459,14 +1708,8 @@ def consult_request_timeout(consult_type: str) -> int:
     return int(os.getenv("DEEPSEEK_TIMEOUT") or "70")
 
 
-def call_deepseek(system_prompt: str, user_content: str, max_tokens: int | None = None, timeout: int | None = None) -> str:
-    if not DEEPSEEK_API_KEY:
-        raise RuntimeError("Missing DEEPSEEK_API_KEY")
-
-    max_tokens = max_tokens or int(os.getenv("DEEPSEEK_MAX_TOKENS") or "1800")
-    timeout = timeout or int(os.getenv("DEEPSEEK_TIMEOUT") or "70")
-
-    payload = {
+def deepseek_payload(system_prompt: str, user_content: str, max_tokens: int | None = None) -> dict:
+    return {
         "model": DEEPSEEK_MODEL,
         "messages": [
             {"role": "system", "content": system_prompt},
@@ -1474,26 +1717,169 @@ def call_deepseek(system_prompt: str, user_content: str, max_tokens: int | None
         ],
         "temperature": 0.25,
         "top_p": 0.9,
-        "max_tokens": max_tokens,
+        "max_tokens": max_tokens or int(os.getenv("DEEPSEEK_MAX_TOKENS") or "1800"),
     }
 
-    headers = {
+
+def deepseek_headers() -> dict:
+    return {
         "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
         "Content-Type": "application/json",
     }
 
-    resp = http.post(DEEPSEEK_URL, json=payload, headers=headers, timeout=timeout)
+
+def deepseek_timeout(timeout: int | None = None) -> tuple[float, int]:
+    # Fail fast on connect; the read timeout bounds the gap between bytes, not the whole completion.
+    read_timeout = timeout or int(os.getenv("DEEPSEEK_TIMEOUT") or "70")
+    connect_timeout = float(os.getenv("DEEPSEEK_CONNECT_TIMEOUT") or "10")
+    return connect_timeout, read_timeout
+
+
+DEEPSEEK_CACHE_SIZE = int(os.getenv("DEEPSEEK_CACHE_SIZE") or "128")
+DEEPSEEK_CACHE_TTL_SECONDS = int(os.getenv("DEEPSEEK_CACHE_TTL_SECONDS") or "600")
+_deepseek_cache = OrderedDict()
+_deepseek_cache_lock = threading.Lock()
+
+
+def deepseek_cache_key(payload: dict) -> str:
+    return hashlib.blake2b(orjson.dumps(payload), digest_size=16).hexdigest()
+
+
+def cached_deepseek_answer(key: str) -> str | None:
+    with _deepseek_cache_lock:
+        entry = _deepseek_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, answer = entry
+        if expires_at < time.monotonic():
+            del _deepseek_cache[key]
+            return None
+        _deepseek_cache.move_to_end(key)
+        return answer
+
+
+def remember_deepseek_answer(key: str, answer: str):
+    if DEEPSEEK_CACHE_SIZE <= 0 or DEEPSEEK_CACHE_TTL_SECONDS <= 0:
+        return
+    with _deepseek_cache_lock:
+        _deepseek_cache[key] = (time.monotonic() + DEEPSEEK_CACHE_TTL_SECONDS, answer)
+        _deepseek_cache.move_to_end(key)
+        while len(_deepseek_cache) > DEEPSEEK_CACHE_SIZE:
+            _deepseek_cache.popitem(last=False)
+
+
+def call_deepseek(
+    system_prompt: str,
+    user_content: str,
+    max_tokens: int | None = None,
+    timeout: int | None = None,
+    use_cache: bool = True,
+) -> str:
+    if not DEEPSEEK_API_KEY:
+        raise RuntimeError("Missing DEEPSEEK_API_KEY")
+
+    payload = deepseek_payload(system_prompt, user_content, max_tokens)
+    cache_key = deepseek_cache_key(payload)
+    if use_cache:
+        cached = cached_deepseek_answer(cache_key)
+        if cached is not None:
+            return cached
+
+    resp = http.post(DEEPSEEK_URL, json=payload, headers=deepseek_headers(), timeout=deepseek_timeout(timeout))
     resp.raise_for_status()
-    out = resp.json()
+    out = orjson.loads(resp.content)
     answer = (((out.get("choices") or [{}])[0]).get("message", {}) or {}).get("content", "").strip()
-    return answer or "No response."
+    if not answer:
+        return "No response."
+    remember_deepseek_answer(cache_key, answer)
+    return answer
+
+
+DEEPSEEK_BATCH_LIMIT = int(os.getenv("DEEPSEEK_BATCH_LIMIT") or "8")
+_deepseek_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DEEPSEEK_POOL_WORKERS") or str(DEEPSEEK_BATCH_LIMIT)),
+    thread_name_prefix="deepseek",
+)
+
+
+def call_deepseek_many(
+    prompts: list[tuple[str, str]],
+    max_tokens: int | None = None,
+    timeout: int | None = None,
+    use_cache: bool = True,
+) -> list[str | None]:
+    futures = [
+        _deepseek_pool.submit(
+            call_deepseek, system_prompt, user_content, max_tokens=max_tokens, timeout=timeout, use_cache=use_cache
+        )
+        for system_prompt, user_content in prompts
+    ]
+    answers = []
+    for future in futures:
+        try:
+            answers.append(future.result())
+        except Exception as e:
+            print("DEEPSEEK ERROR:", repr(e))
+            answers.append(None)
+    return answers
+
+
+def stream_deepseek(system_prompt: str, user_content: str, max_tokens: int | None = None, timeout: int | None = None):
+    if not DEEPSEEK_API_KEY:
+        raise RuntimeError("Missing DEEPSEEK_API_KEY")
+
+    payload = deepseek_payload(system_prompt, user_content, max_tokens)
+    payload["stream"] = True
+
+    with http.post(
+        DEEPSEEK_URL, json=payload, headers=deepseek_headers(), timeout=deepseek_timeout(timeout), stream=True
+    ) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines(chunk_size=4096):
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                chunk = orjson.loads(data)
+            except ValueError:
+                continue
+            delta = (((chunk.get("choices") or [{}])[0]).get("delta", {}) or {}).get("content")
+            if delta:
+                yield delta
+
+
+def wants_event_stream(data: dict) -> bool:
+    return data.get("stream") is True or "text/event-stream" in (request.headers.get("Accept") or "")
+
+
+def deepseek_event_stream(system_prompt: str, user_content: str, max_tokens: int | None = None, timeout: int | None = None):
+    def events():
+        try:
+            for delta in stream_deepseek(system_prompt, user_content, max_tokens=max_tokens, timeout=timeout):
+                yield f"data: {orjson.dumps({'delta': delta}).decode('utf-8')}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            print("DEEPSEEK ERROR:", repr(e))
+            yield f"data: {orjson.dumps({'error': 'AI request failed'}).decode('utf-8')}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+JSON_FENCE_OPEN_RE = re.compile(r"^```(?:json)?\s*", re.IGNORECASE)
+JSON_FENCE_CLOSE_RE = re.compile(r"\s*```$")
 
 
 def parse_json_object(text: str) -> dict | None:
     candidate = (text or "").strip()
     if candidate.startswith("```"):
-        candidate = re.sub(r"^```(?:json)?\s*", "", candidate, flags=re.IGNORECASE)
-        candidate = re.sub(r"\s*```$", "", candidate)
+        candidate = JSON_FENCE_OPEN_RE.sub("", candidate)
+        candidate = JSON_FENCE_CLOSE_RE.sub("", candidate)
     start = candidate.find("{")
     end = candidate.rfind("}")
     if start < 0 or end < start:
@@ -1516,21 +1902,25 @@ def clean_ed_mh_review_value(value, limit: int = 12000):
     return str(value or "").strip()[:limit]
 
 
+ED_MH_REVIEW_PLACEHOLDER_RE = re.compile(
+    r"^(?:not (?:formally )?(?:documented|assessed|recorded|provided|specified)|unknown|n/?a|"
+    r"no (?:relevant )?(?:information|assessment|documentation|findings?|history) "
+    r"(?:is |was )?(?:available|provided|recorded|documented)|"
+    r"no evidence documented(?: in the supplied information)?)\.?$",
+    flags=re.IGNORECASE,
+)
+LIST_MARKER_RE = re.compile(r"^[-*]\s*")
+EXCESS_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
 def clean_ed_mh_review_assist_text(value, limit: int = 12000) -> str:
-    placeholder = re.compile(
-        r"^(?:not (?:formally )?(?:documented|assessed|recorded|provided|specified)|unknown|n/?a|"
-        r"no (?:relevant )?(?:information|assessment|documentation|findings?|history) "
-        r"(?:is |was )?(?:available|provided|recorded|documented)|"
-        r"no evidence documented(?: in the supplied information)?)\.?$",
-        flags=re.IGNORECASE,
-    )
     kept = []
     for raw_line in str(value or "").splitlines():
-        stripped = re.sub(r"^[-*]\s*", "", raw_line.strip())
+        stripped = LIST_MARKER_RE.sub("", raw_line.strip())
         content = stripped.split(":", 1)[1].strip() if ":" in stripped else stripped
-        if not placeholder.fullmatch(content):
+        if not ED_MH_REVIEW_PLACEHOLDER_RE.fullmatch(content):
             kept.append(raw_line.rstrip())
-    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()[:limit]
+    return EXCESS_BLANK_LINES_RE.sub("\n\n", "\n".join(kept)).strip()[:limit]
 
 @app.get("/", endpoint="index")
 def index():
@@ -1639,22 +2029,21 @@ def generate():
     query = (data.get("query") or "").strip()
     mode = (data.get("mode") or "clinical").strip().lower()
 
+    use_cache = data.get("no_cache") is not True
+    if isinstance(data.get("queries"), list):
+        # Batched answers come back together as JSON; only single queries can stream.
+        if data.get("stream") is True:
+            return jsonify({"error": "Streaming is not supported for batched queries"}), 400
+        return generate_many(data["queries"], mode, use_cache=use_cache)
     if not query:
         return jsonify({"error": "Empty query"}), 400
 
-    try:
-        if mode.startswith("dva"):
-            referral_intent = "D0904 new" if mode == "dva_new" else "D0904 renewal" if mode == "dva_renew" else "D0904 (unspecified)"
-            user_content = (
-                f"Referral intent: {referral_intent}\n\n"
-                f"DETAILS:\n{query}\n\n"
-                "Follow DVA_META format then clinical headings."
-            )
-            answer = call_deepseek(DVA_SYSTEM_PROMPT, user_content)
-        else:
-            user_content = f"Clinical question:\n{query}\n\nIf pasted data is included, sort it into the correct headings."
-            answer = call_deepseek(CLINICAL_SYSTEM_PROMPT, user_content)
+    system_prompt, user_content = build_generate_prompt(mode, query)
+    if wants_event_stream(data):
+        return deepseek_event_stream(system_prompt, user_content)
 
+    try:
+        answer = call_deepseek(system_prompt, user_content, use_cache=use_cache)
         return jsonify({"answer": answer})
 
     except Exception as e:
@@ -1662,6 +2051,26 @@ def generate():
         return jsonify({"error": "AI request failed"}), 502
 
 
+def generate_many(queries: list, mode: str, use_cache: bool = True):
+    if not all(isinstance(q, str) for q in queries):
+        return jsonify({"error": "Each query must be a string"}), 400
+    queries = [q.strip() for q in queries]
+    if not queries or not all(queries):
+        return jsonify({"error": "Empty query"}), 400
+    if len(queries) > DEEPSEEK_BATCH_LIMIT:
+        return jsonify({"error": f"At most {DEEPSEEK_BATCH_LIMIT} queries per request"}), 400
+
+    answers = call_deepseek_many([build_generate_prompt(mode, q) for q in queries], use_cache=use_cache)
+    if all(answer is None for answer in answers):
+        return jsonify({"error": "AI request failed"}), 502
+    return jsonify({
+        "answers": [
+            {"answer": answer} if answer is not None else {"error": "AI request failed"}
+            for answer in answers
+        ]
+    })
+
+
 @app.post("/api/ed-mh-review/assist")
 @require_auth
 def ed_mh_review_assist():
@@ -1792,28 +2201,36 @@ def consult():
     if not text:
         return jsonify({"error": "Empty input"}), 400
 
-    try:
-        if mode == "handover":
-            user_content = (
-                "Create a handover/presentation from the following raw dictation/pasted data. "
-                "If the context is not ED, adapt appropriately.\n\n"
-                f"{text}"
-            )
-            answer = call_deepseek(HANDOVER_SYSTEM_PROMPT, user_content)
-        else:
-            user_content = (
-                "Create a structured clinical note from the following raw dictation/pasted data. "
-                "Do not invent facts; organise clearly.\n\n"
-                f"{build_consult_prompt_context(consult_type)}\n\n"
-                f"{text}"
-            )
-            answer = call_deepseek(
-                CONSULT_NOTE_SYSTEM_PROMPT,
-                user_content,
-                max_tokens=consult_completion_budget(consult_type),
-                timeout=consult_request_timeout(consult_type),
-            )
+    if mode == "handover":
+        system_prompt = HANDOVER_SYSTEM_PROMPT
+        user_content = (
+            "Create a handover/presentation from the following raw dictation/pasted data. "
+            "If the context is not ED, adapt appropriately.\n\n"
+            f"{text}"
+        )
+        max_tokens = timeout = None
+    else:
+        system_prompt = CONSULT_NOTE_SYSTEM_PROMPT
+        user_content = (
+            "Create a structured clinical note from the following raw dictation/pasted data. "
+            "Do not invent facts; organise clearly.\n\n"
+            f"{build_consult_prompt_context(consult_type)}\n\n"
+            f"{text}"
+        )
+        max_tokens = consult_completion_budget(consult_type)
+        timeout = consult_request_timeout(consult_type)
 
+    if wants_event_stream(data):
+        return deepseek_event_stream(system_prompt, user_content, max_tokens=max_tokens, timeout=timeout)
+
+    try:
+        answer = call_deepseek(
+            system_prompt,
+            user_content,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            use_cache=data.get("no_cache") is not True,
+        )
         return jsonify({"answer": answer})
 
     except Exception as e:
@@ -1876,59 +2293,156 @@ def stripe_checkout_not_configured():
     # Explicit response avoids silent 404s in the legacy UI.
     return jsonify({"error": "Stripe checkout is not configured in this build"}), 501
 
-@app.post("/api/transcribe")
-@require_auth
-def transcribe():
+def read_audio_upload():
     f = request.files.get("audio")
     if not f:
-        return jsonify({"error": "Missing audio"}), 400
+        return None, None, (jsonify({"error": "Missing audio"}), 400)
 
     if request.content_length and request.content_length > MAX_AUDIO_UPLOAD_BYTES:
-        return jsonify({"error": "Audio upload is too large"}), 413
+        return None, None, (jsonify({"error": "Audio upload is too large"}), 413)
 
     audio_bytes = f.read(MAX_AUDIO_UPLOAD_BYTES + 1)
     if not audio_bytes:
-        return jsonify({"error": "Missing audio"}), 400
+        return None, None, (jsonify({"error": "Missing audio"}), 400)
     if len(audio_bytes) > MAX_AUDIO_UPLOAD_BYTES:
-        return jsonify({"error": "Audio upload is too large"}), 413
+        return None, None, (jsonify({"error": "Audio upload is too large"}), 413)
+    return audio_bytes, f.mimetype or "audio/webm", None
+
+
+def whisper_text(audio, options: dict) -> str:
+    model = get_whisper_model()
+    segments, _info = model.transcribe(audio, **options)
+    return " ".join((seg.text or "").strip() for seg in segments).strip()
+
+
+@app.post("/api/transcribe")
+@require_auth
+def transcribe():
+    audio_bytes, mimetype, error = read_audio_upload()
+    if error:
+        return error
+
+    stream_requested = (request.form.get("stream") or "").strip().lower() in {"1", "true", "yes", "on"}
+    stream = wants_event_stream({"stream": stream_requested})
+    options = whisper_transcribe_options(requested_beam_size(request.form.get("beam")))
+    cache_key = f"{audio_cache_key(audio_bytes)}:{options['beam_size']}"
+    cached = None if stream else cached_transcript(cache_key)
+    if cached is not None:
+        return jsonify({"text": cached})
 
     if (os.getenv("DEEPGRAM_API_KEY") or "").strip():
         try:
-            text = transcribe_audio_with_deepgram(audio_bytes, f.mimetype or "audio/webm")
+            text = transcribe_audio_with_deepgram(audio_bytes, mimetype)
+            remember_transcript(cache_key, text)
             return jsonify({"text": text})
         except Exception as exc:
             app.logger.warning("Deepgram mic transcription failed: %s", exc)
             if not env_flag("MIC_TRANSCRIBE_FALLBACK_TO_WHISPER", False):
                 return jsonify({"error": "Deepgram transcription failed"}), 502
 
-    with _transcribe_lock:
-        tmp_path = None
+    if not _transcribe_slots.acquire(timeout=TRANSCRIBE_QUEUE_TIMEOUT_SECONDS):
+        return jsonify({"error": "Transcription is busy, please try again"}), 429
+    release_slot = True
+    try:
+        audio = decode_audio(BytesIO(audio_bytes), sampling_rate=WHISPER_SAMPLE_RATE)
+        if stream:
+            response = whisper_event_stream(audio, options)
+            release_slot = False
+            return response
+        text = whisper_text(audio, options)
+        remember_transcript(cache_key, text)
+        return jsonify({"text": text})
+
+    except Exception as e:
+        print("TRANSCRIBE ERROR:", repr(e))
+        return jsonify({"error": "Transcription failed"}), 500
+    finally:
+        if release_slot:
+            _transcribe_slots.release()
+
+
+TRANSCRIBE_JOB_TTL_SECONDS = int(os.getenv("TRANSCRIBE_JOB_TTL_SECONDS") or "600")
+TRANSCRIBE_JOB_BACKLOG = int(os.getenv("TRANSCRIBE_JOB_BACKLOG") or str(TRANSCRIBE_CONCURRENCY * 4))
+_transcribe_jobs = {}
+_transcribe_jobs_lock = threading.Lock()
+_transcribe_job_pool = ThreadPoolExecutor(max_workers=TRANSCRIBE_CONCURRENCY, thread_name_prefix="transcribe")
+
+
+def run_transcribe_job(audio_bytes: bytes, mimetype: str, options: dict, cache_key: str) -> str:
+    cached = cached_transcript(cache_key)
+    if cached is not None:
+        return cached
+
+    if (os.getenv("DEEPGRAM_API_KEY") or "").strip():
         try:
-            fd, tmp_path = tempfile.mkstemp(suffix=".webm")
-            os.close(fd)
-            with open(tmp_path, "wb") as tmp:
-                tmp.write(audio_bytes)
+            text = transcribe_audio_with_deepgram(audio_bytes, mimetype)
+            remember_transcript(cache_key, text)
+            return text
+        except Exception as exc:
+            app.logger.warning("Deepgram job transcription failed: %s", exc)
+            if not env_flag("MIC_TRANSCRIBE_FALLBACK_TO_WHISPER", False):
+                raise
 
-            wav_path = tmp_path + ".wav"
-            cmd = ["ffmpeg", "-y", "-i", tmp_path, "-ar", "16000", "-ac", "1", wav_path]
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+    audio = decode_audio(BytesIO(audio_bytes), sampling_rate=WHISPER_SAMPLE_RATE)
+    # Unlike /api/transcribe, jobs wait for a free Whisper slot without a timeout: they hold a pool
+    # thread rather than a request thread, and TRANSCRIBE_JOB_BACKLOG bounds how many can queue.
+    with _transcribe_slots:
+        text = whisper_text(audio, options)
+    remember_transcript(cache_key, text)
+    return text
 
-            model = get_whisper_model()
-            segments, _info = model.transcribe(wav_path, beam_size=5, vad_filter=True)
 
-            text = " ".join((seg.text or "").strip() for seg in segments).strip()
-            return jsonify({"text": text})
+def prune_transcribe_jobs():
+    cutoff = time.monotonic() - TRANSCRIBE_JOB_TTL_SECONDS
+    with _transcribe_jobs_lock:
+        expired = [
+            job_id for job_id, job in _transcribe_jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del _transcribe_jobs[job_id]
 
-        except Exception as e:
-            print("TRANSCRIBE ERROR:", repr(e))
-            return jsonify({"error": "Transcription failed"}), 500
-        finally:
-            for p in [tmp_path, (tmp_path + ".wav") if tmp_path else None]:
-                if p and os.path.exists(p):
-                    try:
-                        os.remove(p)
-                    except Exception:
-                        pass
+
+@app.post("/api/transcribe/jobs")
+@require_auth
+def transcribe_job_create():
+    audio_bytes, mimetype, error = read_audio_upload()
+    if error:
+        return error
+
+    options = whisper_transcribe_options(requested_beam_size(request.form.get("beam")))
+    cache_key = f"{audio_cache_key(audio_bytes)}:{options['beam_size']}"
+    prune_transcribe_jobs()
+    job_id = uuid4().hex
+    with _transcribe_jobs_lock:
+        # Queued jobs hold their upload in memory, so shed new ones once the backlog is full.
+        if sum(not job["future"].done() for job in _transcribe_jobs.values()) >= TRANSCRIBE_JOB_BACKLOG:
+            return jsonify({"error": "Transcription is busy, please try again"}), 429
+        future = _transcribe_job_pool.submit(run_transcribe_job, audio_bytes, mimetype, options, cache_key)
+        job = _transcribe_jobs[job_id] = {"future": future, "finished_at": None}
+    # The TTL runs from completion so a job that sat in the queue is not pruned before it is polled.
+    future.add_done_callback(lambda _future: job.update(finished_at=time.monotonic()))
+    return jsonify({"job": job_id, "status": "pending"}), 202
+
+
+@app.get("/api/transcribe/jobs/<job_id>")
+@require_auth
+def transcribe_job_status(job_id: str):
+    prune_transcribe_jobs()
+    with _transcribe_jobs_lock:
+        job = _transcribe_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown transcription job"}), 404
+
+    future = job["future"]
+    if not future.done():
+        return jsonify({"job": job_id, "status": "pending"}), 202
+    try:
+        text = future.result()
+    except Exception as e:
+        print("TRANSCRIBE ERROR:", repr(e))
+        return jsonify({"job": job_id, "status": "error", "error": "Transcription failed"}), 500
+    return jsonify({"job": job_id, "status": "done", "text": text})
 
 
 @app.get("/api/history/list")
@@ -2029,5 +2543,6 @@ def api_history_save():
     return jsonify({"ok": True})
 
 if __name__ == "__main__":
+    start_whisper_warmup()
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=False)
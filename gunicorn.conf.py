@@ -0,0 +1,6 @@
+def post_worker_init(worker):
+    # Load and warm the Whisper model in the background once the worker has imported the app,
+    # so the first /api/transcribe request does not pay the model load.
+    from app import start_whisper_warmup
+
+    start_whisper_warmup()
@@ -1,10 +1,24 @@
 import base64
 import hashlib
 import hmac
+import os
+import tempfile
+import threading
 import unittest
+import wave
+from concurrent.futures import Future
 from io import BytesIO
 from pathlib import Path
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# app.py opens DB_PATH and creates its tables at import, so keep the suite off the working-tree database.
+_test_db_dir = tempfile.TemporaryDirectory()
+os.environ["DB_PATH"] = os.path.join(_test_db_dir.name, "vividmedi-test.db")
+
+
+def tearDownModule():
+    _test_db_dir.cleanup()
 
 
 def twilio_signature(url, auth_token, params=None):
@@ -35,6 +49,31 @@ class RouteRegistrationTests(unittest.TestCase):
             self.assertIn(path, by_path)
             self.assertEqual(len(by_path[path]), 1, f"{path} should be registered once")
 
+    def test_json_responses_use_orjson_provider(self):
+        import app as app_module
+
+        with app_module.app.test_request_context():
+            response = app_module.jsonify({"answer": "Paracetamol 1 g – max 4 g/day"})
+
+        self.assertIsInstance(app_module.app.json, app_module.OrjsonProvider)
+        self.assertEqual(response.get_data(), '{"answer":"Paracetamol 1 g – max 4 g/day"}\n'.encode("utf-8"))
+        self.assertEqual(response.get_json(), {"answer": "Paracetamol 1 g – max 4 g/day"})
+
+    def test_perf_stats_serialises_integer_status_code_keys(self):
+        import app as app_module
+
+        app_module.app.config.update(TESTING=True)
+        client = app_module.app.test_client()
+        with client.session_transaction() as sess:
+            sess["authenticated"] = True
+
+        self.assertEqual(client.get("/health").status_code, 200)
+        response = client.get("/api/perf/stats")
+
+        self.assertEqual(response.status_code, 200)
+        health = response.get_json()["endpoints"]["GET /health"]
+        self.assertIn("200", health["status_codes"])
+
     def test_wa_mental_health_discharge_summary_prompt_uses_psychiatry_structure(self):
         import app as app_module
 
@@ -58,6 +97,15 @@ class RouteRegistrationTests(unittest.TestCase):
         self.assertGreaterEqual(app_module.consult_request_timeout("WA mental health discharge summary"), 150)
         self.assertEqual(app_module.consult_completion_budget("General consultation note"), 1800)
 
+    def test_static_consult_contexts_are_built_once(self):
+        import app as app_module
+
+        first = app_module.build_consult_prompt_context("Emergency department note")
+        second = app_module.build_consult_prompt_context("  emergency department NOTE ")
+
+        self.assertIs(first, second)
+        self.assertIn("Presenting Complaint", first)
+
     def test_ed_mh_review_prompt_uses_requested_psychiatry_structure_and_safeguards(self):
         import app as app_module
 
@@ -81,6 +129,30 @@ class RouteRegistrationTests(unittest.TestCase):
         self.assertIn("Never print placeholders", prompt)
         self.assertNotIn("use 'Not documented'", prompt)
 
+    def test_vapac_prompt_uses_cached_perth_date(self):
+        import app as app_module
+        from datetime import datetime
+
+        expected = datetime.now(app_module.PERTH_TZ).strftime("%d/%m/%Y")
+        prompt = app_module.build_consult_prompt_context("VAPAC weight loss application")
+
+        self.assertIn(expected, prompt)
+
+    def test_generate_prompt_fills_precomputed_mode_templates(self):
+        import app as app_module
+
+        system_prompt, user_content = app_module.build_generate_prompt("dva_renew", "BP {140/90}")
+        self.assertIs(system_prompt, app_module.DVA_SYSTEM_PROMPT)
+        self.assertEqual(
+            user_content,
+            "Referral intent: D0904 renewal\n\nDETAILS:\nBP {140/90}\n\nFollow DVA_META format then clinical headings.",
+        )
+        self.assertIn("D0904 (unspecified)", app_module.build_generate_prompt("dva_other", "x")[1])
+
+        system_prompt, user_content = app_module.build_generate_prompt("clinical", "AF rate control")
+        self.assertIs(system_prompt, app_module.CLINICAL_SYSTEM_PROMPT)
+        self.assertTrue(user_content.startswith("Clinical question:\nAF rate control\n\n"))
+
     def test_ed_mh_review_gets_longer_completion_budget_and_timeout(self):
         import app as app_module
 
@@ -263,6 +335,200 @@ class EdMhReviewTests(unittest.TestCase):
         self.assertIsNone(app_module.parse_json_object("no structured output"))
 
 
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self._lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        return None
+
+    def iter_lines(self, chunk_size=512):
+        return iter(self._lines)
+
+
+class DeepSeekStreamingTests(unittest.TestCase):
+    def authenticated_client(self):
+        import app as app_module
+
+        app_module.app.config.update(TESTING=True)
+        client = app_module.app.test_client()
+        with client.session_transaction() as sess:
+            sess["authenticated"] = True
+        return app_module, client
+
+    def test_stream_deepseek_yields_utf8_content_deltas(self):
+        import app as app_module
+
+        lines = [
+            b": keep-alive",
+            b"",
+            'data: {"choices":[{"delta":{"content":"Hb 120 g/L \u2014 "}}]}'.encode("utf-8"),
+            b'data: {"choices":[{"delta":{}}]}',
+            'data: {"choices":[{"delta":{"content":"stable"}}]}'.encode("utf-8"),
+            b"data: [DONE]",
+        ]
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(app_module.http, "post") as post:
+            post.return_value = FakeStreamResponse(lines)
+            deltas = list(app_module.stream_deepseek("system", "user"))
+
+        self.assertEqual(deltas, ["Hb 120 g/L \u2014 ", "stable"])
+        self.assertTrue(post.call_args.kwargs["json"]["stream"])
+        self.assertTrue(post.call_args.kwargs["stream"])
+
+    def test_deepseek_calls_use_separate_connect_and_read_timeouts(self):
+        import app as app_module
+
+        env = {"DEEPSEEK_CONNECT_TIMEOUT": "5", "DEEPSEEK_TIMEOUT": ""}
+        with patch.dict("os.environ", env, clear=False), patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module.http, "post"
+        ) as post:
+            post.return_value = FakeStreamResponse([b"data: [DONE]"])
+            list(app_module.stream_deepseek("system", "user", timeout=150))
+
+        self.assertEqual(post.call_args.kwargs["timeout"], (5.0, 150))
+        with patch.dict("os.environ", env, clear=False):
+            self.assertEqual(app_module.deepseek_timeout(), (5.0, 70))
+
+    def test_generate_streams_server_sent_events_when_requested(self):
+        app_module, client = self.authenticated_client()
+
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module, "stream_deepseek", return_value=iter(["Summary", "\nAssessment"])
+        ), patch.object(app_module, "call_deepseek") as blocking_call:
+            response = client.post("/api/generate", json={"query": "chest pain", "stream": True})
+            body = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertIn('data: {"delta":"Summary"}', body)
+        self.assertTrue(body.endswith("data: [DONE]\n\n"))
+        blocking_call.assert_not_called()
+
+    def test_generate_returns_json_without_stream_flag(self):
+        app_module, client = self.authenticated_client()
+
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module, "call_deepseek", return_value="Summary"
+        ):
+            response = client.post("/api/generate", json={"query": "chest pain"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"answer": "Summary"})
+
+
+    def test_generate_fans_out_query_batches_in_order(self):
+        app_module, client = self.authenticated_client()
+
+        def fake_call(system_prompt, user_content, **kwargs):
+            if "syncope" in user_content:
+                raise RuntimeError("upstream timeout")
+            return user_content
+
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module, "call_deepseek", side_effect=fake_call
+        ) as call:
+            response = client.post("/api/generate", json={"queries": ["chest pain", "syncope", "AF rate"]})
+
+        self.assertEqual(response.status_code, 200)
+        answers = response.get_json()["answers"]
+        self.assertEqual(len(answers), 3)
+        self.assertEqual(answers[1], {"error": "AI request failed"})
+        self.assertIn("chest pain", answers[0]["answer"])
+        self.assertIn("AF rate", answers[2]["answer"])
+        self.assertEqual(call.call_count, 3)
+
+    def test_call_deepseek_reuses_cached_answer_unless_bypassed(self):
+        import app as app_module
+
+        upstream = MagicMock()
+        upstream.content = b'{"choices":[{"message":{"content":"Start aspirin 300 mg"}}]}'
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module, "_deepseek_cache", app_module.OrderedDict()
+        ), patch.object(app_module.http, "post", return_value=upstream) as post:
+            first = app_module.call_deepseek("system", "suspected stroke")
+            second = app_module.call_deepseek("system", "suspected stroke")
+            app_module.call_deepseek("system", "suspected stroke", use_cache=False)
+
+        self.assertEqual(first, "Start aspirin 300 mg")
+        self.assertEqual(second, first)
+        self.assertEqual(post.call_count, 2)
+
+    def test_generate_rejects_oversized_query_batches(self):
+        app_module, client = self.authenticated_client()
+
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(app_module, "DEEPSEEK_BATCH_LIMIT", 2):
+            response = client.post("/api/generate", json={"queries": ["a", "b", "c"]})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_generate_rejects_non_string_or_streamed_query_batches(self):
+        app_module, client = self.authenticated_client()
+
+        with patch.object(app_module, "DEEPSEEK_API_KEY", "test-key"), patch.object(
+            app_module, "call_deepseek_many"
+        ) as batch_call:
+            for body in (
+                {"queries": ["chest pain", {"q": 1}]},
+                {"queries": ["chest pain", 0]},
+                {"queries": ["chest pain"], "stream": True},
+            ):
+                response = client.post("/api/generate", json=body)
+                self.assertEqual(response.status_code, 400, body)
+
+        batch_call.assert_not_called()
+
+
+class DatabaseTests(unittest.TestCase):
+    def test_db_conn_reuses_pooled_wal_connection(self):
+        import app as app_module
+
+        with app_module.db_conn() as first:
+            journal_mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        with app_module.db_conn() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(journal_mode.lower(), "wal")
+
+    def test_utc_now_iso_matches_second_resolution_isoformat(self):
+        import app as app_module
+
+        with patch.object(app_module.time, "time", return_value=1767225600.75):
+            stamp = app_module.utc_now_iso()
+
+        self.assertEqual(stamp, "2026-01-01T00:00:00")
+
+    def test_medirecords_sync_round_trips_payload(self):
+        import app as app_module
+
+        payload = {"patient": {"name": "Zoë Nguyen", "allergies": ["penicillin"]}, "visit": 3}
+        app_module.save_medirecords_sync(payload, source="test")
+        latest = app_module.latest_medirecords_sync()
+
+        self.assertEqual(latest["payload"], payload)
+        self.assertEqual(latest["source"], "test")
+
+    def test_history_lookup_uses_user_key_index(self):
+        import app as app_module
+
+        with app_module.db_conn() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id, item_type, content, created_at FROM history_entries "
+                "WHERE user_key = ? ORDER BY id DESC LIMIT ?",
+                ("guest", 10),
+            ).fetchall()
+
+        detail = " ".join(row["detail"] for row in plan)
+        self.assertIn("ix_history_user_id", detail)
+        self.assertNotIn("TEMP B-TREE", detail)
+
+
 class AuthenticationTests(unittest.TestCase):
     def test_authentication_fails_closed_without_auth_code(self):
         import app as app_module
@@ -408,6 +674,27 @@ class TwilioCallingTests(unittest.TestCase):
         self.assertNotIn("<Start><Stream", xml)
         self.assertIn("<Dial><Conference", xml)
 
+    def test_phone_and_stream_name_normalisation(self):
+        import app as app_module
+
+        self.assertEqual(app_module.normalize_au_phone("0412 345 678"), "+61412345678")
+        self.assertEqual(app_module.normalize_au_phone("(61) 412-345-678"), "+61412345678")
+        self.assertEqual(app_module.normalize_e164_phone("+1 (415) 555-0100"), "+14155550100")
+        self.assertEqual(app_module.normalize_e164_phone("0412 345 678"), "")
+        self.assertEqual(app_module.twilio_stream_name("ward 3/bed 12", "doctor!"), "ward-3-bed-12-doctor")
+
+    def test_media_stream_url_maps_http_schemes_to_websockets(self):
+        import app as app_module
+
+        for base_url, expected in [
+            ("http://localhost:5000", "ws://localhost:5000/twilio-stream"),
+            ("HTTPS://www.vividmedi.com/", "wss://www.vividmedi.com/twilio-stream"),
+            ("www.vividmedi.com", "wss://www.vividmedi.com/twilio-stream"),
+        ]:
+            with patch.dict("os.environ", {"APP_BASE_URL": base_url, "BASE_URL": "", "STREAM_URL": ""}, clear=False):
+                with app_module.app.test_request_context():
+                    self.assertEqual(app_module.twilio_media_stream_url("room", "doctor"), expected)
+
     def test_doctor_stream_labels_tracks_as_clinician_and_patient(self):
         import app as app_module
 
@@ -442,6 +729,17 @@ class TwilioCallingTests(unittest.TestCase):
         self.assertEqual(payload["type"], "transcript-preview")
         self.assertEqual(payload["text"], "Clinician: patient reports nausea")
 
+    def test_broadcast_transcript_encodes_payload_once_for_all_clients(self):
+        import app as app_module
+
+        clients = [MagicMock(), MagicMock()]
+        with patch.object(app_module, "transcript_clients", set(clients)):
+            app_module.broadcast_transcript({"type": "transcript", "text": "Patient: dizzy – since Monday"})
+
+        sent = [client.send.call_args.args[0] for client in clients]
+        self.assertEqual(sent[0], '{"type":"transcript","text":"Patient: dizzy – since Monday"}')
+        self.assertIs(sent[0], sent[1])
+
     def test_join_consult_rejects_unsigned_twilio_request_when_token_configured(self):
         _app_module, client = self.authenticated_client()
         env = {
@@ -512,8 +810,18 @@ class MicTranscriptionTests(unittest.TestCase):
         client = app_module.app.test_client()
         with client.session_transaction() as sess:
             sess["authenticated"] = True
+        app_module._transcript_cache.clear()
         return app_module, client
 
+    def silent_wav(self):
+        wav = BytesIO()
+        with wave.open(wav, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(8000)
+            writer.writeframes(b"\x00\x00" * 800)
+        return wav.getvalue()
+
     def test_transcribe_uses_deepgram_when_configured(self):
         app_module, client = self.authenticated_client()
         deepgram_body = {
@@ -554,6 +862,270 @@ class MicTranscriptionTests(unittest.TestCase):
         self.assertIn("Deepgram transcription failed", response.get_json()["error"])
         whisper.assert_not_called()
 
+    def test_whisper_fallback_decodes_upload_in_process(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        model.transcribe.return_value = ([SimpleNamespace(text=" patient is well ")], None)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ):
+            response = client.post(
+                "/api/transcribe",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["text"], "patient is well")
+        audio = model.transcribe.call_args.args[0]
+        self.assertEqual(audio.dtype.name, "float32")
+        self.assertEqual(len(audio), 1600)
+
+    def test_repeated_upload_is_served_from_transcript_cache(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        model.transcribe.return_value = ([SimpleNamespace(text="no known allergies")], None)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ):
+            responses = [
+                client.post(
+                    "/api/transcribe",
+                    data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                    content_type="multipart/form-data",
+                )
+                for _ in range(2)
+            ]
+
+        self.assertEqual([r.get_json()["text"] for r in responses], ["no known allergies"] * 2)
+        model.transcribe.assert_called_once()
+
+    def test_whisper_streams_segments_as_server_sent_events(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        segments = [SimpleNamespace(text=" chest pain "), SimpleNamespace(text=""), SimpleNamespace(text=" since Tuesday")]
+        model.transcribe.return_value = (iter(segments), None)
+
+        slots = threading.BoundedSemaphore(1)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ), patch.object(app_module, "_transcribe_slots", slots):
+            response = client.post(
+                "/api/transcribe",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav"), "stream": "true"},
+                content_type="multipart/form-data",
+            )
+            body = response.get_data(as_text=True)
+            response.close()
+
+        self.assertTrue(slots.acquire(blocking=False))
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual(
+            body,
+            'data: {"delta":"chest pain"}\n\ndata: {"delta":"since Tuesday"}\n\ndata: [DONE]\n\n',
+        )
+
+    def test_transcribe_returns_429_when_all_slots_stay_busy(self):
+        app_module, client = self.authenticated_client()
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "_transcribe_slots", slots
+        ), patch.object(app_module, "TRANSCRIBE_QUEUE_TIMEOUT_SECONDS", 0.01), patch.object(
+            app_module, "get_whisper_model"
+        ) as get_model, patch.object(app_module, "decode_audio") as decode:
+            response = client.post(
+                "/api/transcribe",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+
+        self.assertEqual(response.status_code, 429)
+        decode.assert_not_called()
+        get_model.assert_not_called()
+
+    def test_transcribe_releases_slot_when_decode_fails(self):
+        app_module, client = self.authenticated_client()
+        slots = threading.BoundedSemaphore(1)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "_transcribe_slots", slots
+        ), patch.object(app_module, "decode_audio", side_effect=ValueError("bad container")):
+            response = client.post(
+                "/api/transcribe",
+                data={"audio": (BytesIO(b"not audio"), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertTrue(slots.acquire(blocking=False))
+
+    def test_transcribe_job_runs_in_background_and_can_be_polled(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        model.transcribe.return_value = ([SimpleNamespace(text=" bilateral ankle oedema ")], None)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ):
+            created = client.post(
+                "/api/transcribe/jobs",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+            job_id = created.get_json()["job"]
+            app_module._transcribe_jobs[job_id]["future"].result(timeout=5)
+            polled = client.get(f"/api/transcribe/jobs/{job_id}")
+
+        self.assertEqual(created.status_code, 202)
+        self.assertEqual(polled.status_code, 200)
+        self.assertEqual(polled.get_json(), {"job": job_id, "status": "done", "text": "bilateral ankle oedema"})
+        self.assertEqual(client.get("/api/transcribe/jobs/unknown").status_code, 404)
+
+    def test_transcribe_job_returns_429_when_backlog_is_full(self):
+        app_module, client = self.authenticated_client()
+        jobs = {"queued": {"future": Future(), "finished_at": None}}
+
+        with patch.object(app_module, "_transcribe_jobs", jobs), patch.object(
+            app_module, "TRANSCRIBE_JOB_BACKLOG", 1
+        ), patch.object(app_module, "_transcribe_job_pool") as pool:
+            response = client.post(
+                "/api/transcribe/jobs",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+
+        self.assertEqual(response.status_code, 429)
+        pool.submit.assert_not_called()
+        self.assertEqual(list(jobs), ["queued"])
+
+    def test_transcribe_job_pruning_keeps_pending_jobs(self):
+        app_module, client = self.authenticated_client()
+        finished = Future()
+        finished.set_result("left knee pain")
+        jobs = {
+            "finished": {"future": finished, "finished_at": 0.0},
+            "pending": {"future": Future(), "finished_at": None},
+        }
+
+        with patch.object(app_module, "_transcribe_jobs", jobs), patch.object(
+            app_module, "TRANSCRIBE_JOB_TTL_SECONDS", 1
+        ), patch.object(app_module.time, "monotonic", return_value=100.0):
+            pending = client.get("/api/transcribe/jobs/pending")
+            expired = client.get("/api/transcribe/jobs/finished")
+
+        self.assertEqual(pending.status_code, 202)
+        self.assertEqual(expired.status_code, 404)
+        self.assertEqual(list(jobs), ["pending"])
+
+    def test_transcribe_job_waits_for_slot_and_expires_from_completion(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        model.transcribe.return_value = ([SimpleNamespace(text="shortness of breath")], None)
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        now = [0.0]
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ), patch.object(app_module, "_transcribe_slots", slots), patch.object(
+            app_module, "TRANSCRIBE_JOB_TTL_SECONDS", 1
+        ), patch.object(app_module.time, "monotonic", side_effect=lambda: now[0]):
+            created = client.post(
+                "/api/transcribe/jobs",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav")},
+                content_type="multipart/form-data",
+            )
+            job_id = created.get_json()["job"]
+            queued = client.get(f"/api/transcribe/jobs/{job_id}")
+            model.transcribe.assert_not_called()
+
+            now[0] = 100.0
+            slots.release()
+            app_module._transcribe_jobs[job_id]["future"].result(timeout=5)
+            polled = client.get(f"/api/transcribe/jobs/{job_id}")
+
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(polled.status_code, 200)
+        self.assertEqual(polled.get_json()["text"], "shortness of breath")
+
+    def test_whisper_defaults_to_greedy_decoding_without_timestamps(self):
+        import app as app_module
+
+        with patch.object(app_module, "WHISPER_BEAM_SIZE", 1), patch.object(app_module, "WHISPER_BEST_OF", 1):
+            options = app_module.whisper_transcribe_options()
+
+        self.assertEqual(options["beam_size"], 1)
+        self.assertEqual(options["best_of"], 1)
+        self.assertEqual(options["temperature"], 0.0)
+        self.assertTrue(options["without_timestamps"])
+        self.assertFalse(options["condition_on_previous_text"])
+
+    def test_whisper_vad_filter_can_be_disabled(self):
+        import app as app_module
+
+        with patch.object(app_module, "WHISPER_VAD_FILTER", False):
+            options = app_module.whisper_transcribe_options()
+        self.assertFalse(options["vad_filter"])
+        self.assertNotIn("vad_parameters", options)
+
+    def test_whisper_vad_uses_short_silence_window(self):
+        import app as app_module
+
+        with patch.object(app_module, "WHISPER_VAD_FILTER", True), patch.object(
+            app_module, "WHISPER_VAD_MIN_SILENCE_MS", 500
+        ):
+            options = app_module.whisper_transcribe_options()
+
+        self.assertEqual(options["vad_parameters"], {"min_silence_duration_ms": 500})
+
+    def test_transcribe_honours_clamped_per_request_beam(self):
+        app_module, client = self.authenticated_client()
+        model = MagicMock()
+        model.transcribe.return_value = ([SimpleNamespace(text="left knee pain")], None)
+
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": ""}, clear=False), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ), patch.object(app_module, "WHISPER_MAX_BEAM_SIZE", 5):
+            client.post(
+                "/api/transcribe",
+                data={"audio": (BytesIO(self.silent_wav()), "dictation.wav"), "beam": "12"},
+                content_type="multipart/form-data",
+            )
+
+        options = model.transcribe.call_args.kwargs
+        self.assertEqual(options["beam_size"], 5)
+        self.assertNotIn("without_timestamps", options)
+        self.assertEqual(app_module.requested_beam_size("not-a-number"), app_module.WHISPER_BEAM_SIZE)
+
+    def test_whisper_warmup_decodes_one_second_of_silence(self):
+        import app as app_module
+
+        model = MagicMock()
+        model.transcribe.return_value = (iter([]), None)
+        with patch.dict("os.environ", {"DEEPGRAM_API_KEY": "", "WHISPER_PRELOAD": "true"}), patch.object(
+            app_module, "get_whisper_model", return_value=model
+        ):
+            thread = app_module.start_whisper_warmup()
+            thread.join(timeout=5)
+
+        audio = model.transcribe.call_args.args[0]
+        self.assertEqual(audio.shape, (app_module.WHISPER_SAMPLE_RATE,))
+        self.assertFalse(model.transcribe.call_args.kwargs["vad_filter"])
+
+    def test_whisper_warmup_skipped_when_deepgram_handles_mic(self):
+        import app as app_module
+
+        env = {"DEEPGRAM_API_KEY": "dg-key", "MIC_TRANSCRIBE_FALLBACK_TO_WHISPER": "false"}
+        with patch.dict("os.environ", env), patch.object(app_module, "get_whisper_model") as get_model:
+            self.assertIsNone(app_module.start_whisper_warmup())
+
+        get_model.assert_not_called()
+
     def test_transcribe_rejects_oversized_upload(self):
         app_module, client = self.authenticated_client()
         old_limit = app_module.MAX_AUDIO_UPLOAD_BYTES